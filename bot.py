@@ -6,9 +6,11 @@ media-group aggregation, and reactions for feedback.
 """
 
 import asyncio
+import functools
+import io
 import logging
 import os
-from datetime import datetime
+import time
 from dotenv import load_dotenv
 from telegram import Update, ReactionTypeEmoji
 from telegram.ext import (
@@ -19,6 +21,11 @@ from telegram.ext import (
     filters,
 )
 
+try:
+    import uvloop
+except ImportError:  # e.g. Windows; fall back to the stdlib event loop
+    uvloop = None
+
 from drive_uploader import DriveUploader, FileTooLargeError, MimeNotAllowedError
 from topic_manager import TopicManager
 
@@ -34,17 +41,32 @@ ALLOWED_MIME_TYPES = [s.strip() for s in ALLOWED_MIME_TYPES_STR.split(",") if s.
 TEXT_FORMAT = os.environ.get("TEXT_FORMAT", "txt").lower() or "txt"
 SEND_DETAILED_ERRORS = os.environ.get("SEND_DETAILED_ERRORS", "false").lower() in ("true", "1", "yes")
 LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO").upper()
+DRIVE_MAX_CONCURRENT_REQUESTS = int(os.environ.get("DRIVE_MAX_CONCURRENT_REQUESTS", "8"))
 
 # Reactions
 REACTION_PROCESSING = [ReactionTypeEmoji(emoji="\u270d\ufe0f")]  # ✍️
 REACTION_SUCCESS = [ReactionTypeEmoji(emoji="👍")]
 REACTION_ERROR = [ReactionTypeEmoji(emoji="\U0001f937\u200d\u2642\ufe0f")]  # 🤷‍♂️
 
-# Media group buffer: media_group_id -> list of (message, context); processed after delay
-MEDIA_GROUP_DELAY_SEC = 1.5
+# Media group buffer: media_group_id -> list of (message, context); processed once no new
+# part has arrived for MEDIA_GROUP_DELAY_SEC (each part restarts the group's timer).
+# Only touched from the event loop with no await inside a mutation, so no lock is needed.
+MEDIA_GROUP_DELAY_SEC = 1.0
 _media_group_buffer: dict[str, list[tuple]] = {}
-_media_group_lock = asyncio.Lock()
-_media_group_tasks: dict[str, asyncio.Task] = {}
+_media_group_timers: dict[str, asyncio.TimerHandle] = {}
+# Text buffer: (chat_id, user_id, folder_id, hashtag) -> list of (message, context); saved as
+# one note once the user has been quiet for TEXT_BATCH_DELAY_SEC (same restart-on-arrival
+# timer as media groups). The destination is part of the key, resolved when each text
+# arrives, so switching topics mid-batch starts a new batch instead of re-filing the old one.
+TEXT_BATCH_DELAY_SEC = 2.5
+TextBatchKey = tuple[int, int, str, str | None]
+_text_buffer: dict[TextBatchKey, list[tuple]] = {}
+_text_timers: dict[TextBatchKey, asyncio.TimerHandle] = {}
+# Strong refs to tasks started from timers (the loop only keeps weak ones)
+_background_tasks: set[asyncio.Task] = set()
+# Album parts downloaded but not yet uploaded are handed over through a queue this deep;
+# it also bounds concurrent downloads and uploads per album
+MEDIA_GROUP_PIPELINE_DEPTH = 2
 
 logging.basicConfig(
     format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
@@ -55,7 +77,6 @@ logger = logging.getLogger(__name__)
 # Globals set in main()
 topic_manager: TopicManager
 drive_uploader: DriveUploader
-loop: asyncio.AbstractEventLoop
 
 
 async def set_reaction(context: ContextTypes.DEFAULT_TYPE, chat_id: int, message_id: int, reaction_list: list):
@@ -70,16 +91,16 @@ async def set_reaction(context: ContextTypes.DEFAULT_TYPE, chat_id: int, message
         logger.warning("Failed to set reaction: %s", e)
 
 
-def run_sync(sync_fn):
-    """Run sync Drive/IO in executor so event loop is not blocked. sync_fn must take no args."""
-    return loop.run_in_executor(None, sync_fn)
+def _ts_now() -> str:
+    """Current local time as YYYYMMDD_HHMMSS for generated file names."""
+    return time.strftime("%Y%m%d_%H%M%S")
 
 
-async def get_folder_and_hashtag(user_id: int):
-    """Resolve folder_id and optional hashtag for user (async wrapper)."""
-    folder_id = await topic_manager.get_folder_id_for_user(user_id)
-    hashtag = await topic_manager.get_hashtag_for_user(user_id)
-    return folder_id, hashtag
+def _spawn(coro_fn, *args) -> None:
+    """Timer callback: run coro_fn(*args) as a background task."""
+    task = asyncio.create_task(coro_fn(*args))
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
 
 
 async def cmd_start(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
@@ -94,191 +115,213 @@ async def cmd_start(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
 
 async def cmd_topic(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Handle /topic <name> — set current topic by name."""
-    if not update.message or not update.message.text:
+    msg = update.message
+    if not msg or not msg.text:
         return
-    user_id = update.effective_user.id if update.effective_user else 0
-    parts = update.message.text.strip().split(maxsplit=1)
+    parts = msg.text.strip().split(maxsplit=1)
     name = (parts[1] if len(parts) > 1 else "").strip().lower()
     if not name:
-        await update.message.reply_text("Usage: /topic <name> (e.g. /topic work)")
+        await msg.reply_text("Usage: /topic <name> (e.g. /topic work)")
         return
-    ok = await topic_manager.set_user_topic(user_id, name)
-    if ok:
-        await update.message.reply_text(f"Topic set to: {name}")
-        try:
-            await set_reaction(
-                context,
-                update.effective_chat.id,
-                update.message.id,
-                REACTION_SUCCESS,
-            )
-        except Exception:
-            pass
-    else:
-        await update.message.reply_text(f"Unknown topic: {name}. Use /topics to list topics.")
-        try:
-            await set_reaction(
-                context,
-                update.effective_chat.id,
-                update.message.id,
-                REACTION_ERROR,
-            )
-        except Exception:
-            pass
+    await cmd_topic_by_name(update, context, topic_name=name)
 
 
-async def cmd_topic_by_name(update: Update, context: ContextTypes.DEFAULT_TYPE, topic_name: str) -> None:
+async def cmd_topic_by_name(update: Update, context: ContextTypes.DEFAULT_TYPE, *, topic_name: str) -> None:
     """Handle /work, /marketing etc. — set current topic by command name."""
-    if not update.message:
+    msg = update.message
+    if not msg:
         return
-    user_id = update.effective_user.id if update.effective_user else 0
+    user = update.effective_user
+    user_id = user.id if user else 0
     ok = await topic_manager.set_user_topic(user_id, topic_name)
     if ok:
-        await update.message.reply_text(f"Topic set to: {topic_name}")
-        try:
-            await set_reaction(
-                context,
-                update.effective_chat.id,
-                update.message.id,
-                REACTION_SUCCESS,
-            )
-        except Exception:
-            pass
+        await msg.reply_text(f"Topic set to: {topic_name}")
+        await set_reaction(context, msg.chat_id, msg.message_id, REACTION_SUCCESS)
     else:
-        await update.message.reply_text(f"Unknown topic: {topic_name}. Use /topics to list topics.")
-        try:
-            await set_reaction(
-                context,
-                update.effective_chat.id,
-                update.message.id,
-                REACTION_ERROR,
-            )
-        except Exception:
-            pass
+        await msg.reply_text(f"Unknown topic: {topic_name}. Use /topics to list topics.")
+        await set_reaction(context, msg.chat_id, msg.message_id, REACTION_ERROR)
 
 
 async def cmd_topics(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Handle /topics — list topic names and descriptions."""
+    # Pick up hand edits to topics.json (one stat when unchanged)
+    await topic_manager.reload_if_changed()
     topics = await topic_manager.get_all_topics()
     if not topics:
         await update.message.reply_text("No topics configured. Add entries to topics.json.")
         return
     lines = []
     for t in topics:
-        name = t.get("name", "?")
-        desc = t.get("description", "")
-        lines.append(f"• /{name} — {desc}")
+        lines.append(f"• /{t.name} — {t.description or ''}")
     await update.message.reply_text("Topics:\n" + "\n".join(lines))
 
 
 async def cmd_current(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Handle /current — show current topic for the user."""
-    user_id = update.effective_user.id if update.effective_user else 0
-    topic_name = await topic_manager.get_user_topic(user_id)
+    msg = update.message
+    user = update.effective_user
+    topic_name = await topic_manager.get_user_topic(user.id if user else 0)
     if topic_name:
-        await update.message.reply_text(f"Current topic: {topic_name}")
+        await msg.reply_text(f"Current topic: {topic_name}")
     else:
-        await update.message.reply_text("No topic set. Use /topic <name> or /work, /marketing etc.")
+        await msg.reply_text("No topic set. Use /topic <name> or /work, /marketing etc.")
 
 
-async def handle_text(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
-    """Save text message to Drive (txt or Doc)."""
-    if not update.message or not update.message.text:
+async def flush_text_batch(key: TextBatchKey) -> None:
+    """Upload all buffered texts of one (chat_id, user_id, folder_id, hashtag) as a single note."""
+    _text_timers.pop(key, None)
+    entries = _text_buffer.pop(key, None)
+    if not entries:
         return
-    msg = update.message
-    chat_id = msg.chat_id
-    message_id = msg.message_id
-    user_id = update.effective_user.id if update.effective_user else 0
-    username = (update.effective_user.username if update.effective_user else None) or "unknown"
-    text = msg.text
 
-    await set_reaction(context, chat_id, message_id, REACTION_PROCESSING)
+    chat_id, _, folder_id, hashtag = key
+    last_msg, context = entries[-1]
+    user = last_msg.from_user
+    username = (user.username if user else None) or "unknown"
 
     try:
-        folder_id, hashtag = await get_folder_and_hashtag(user_id)
         content_parts = []
         if hashtag:
             content_parts.append(hashtag)
         content_parts.append(f"@{username}")
         content_parts.append("")
-        content_parts.append(text)
+        if len(entries) == 1:
+            content_parts.append(last_msg.text)
+        else:
+            for msg, _ in entries:
+                content_parts.append(f"[{msg.date.astimezone():%H:%M:%S}] {msg.text}")
         content = "\n".join(content_parts)
 
-        ts = datetime.now().strftime("%Y%m%d_%H%M%S")
-        base_name = f"Note_{ts}"
+        base_name = f"Note_{_ts_now()}"
 
-        def _upload():
-            return drive_uploader.upload_text_as_file(
-                folder_id, content, base_name, TEXT_FORMAT
-            )
+        await drive_uploader.upload_text_as_file(
+            folder_id, content, base_name, TEXT_FORMAT
+        )
+        reaction = REACTION_SUCCESS
+    except Exception as e:
+        logger.exception("Text upload failed")
+        reaction = REACTION_ERROR
+        if SEND_DETAILED_ERRORS:
+            await last_msg.reply_text(f"Error: {e}")
 
-        await run_sync(_upload)
-        await set_reaction(context, chat_id, message_id, REACTION_SUCCESS)
+    await asyncio.gather(
+        *(set_reaction(context, chat_id, msg.message_id, reaction) for msg, _ in entries)
+    )
+
+
+async def handle_text(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Buffer text message; the user's batch is saved to Drive (txt or Doc) once they pause."""
+    msg = update.message
+    if not msg or not msg.text:
+        return
+    chat_id = msg.chat_id
+    user = update.effective_user
+    user_id = user.id if user else 0
+
+    try:
+        # Resolved on arrival: a later topic switch must not move texts already sent
+        folder_id, hashtag = topic_manager.get_folder_and_hashtag_for_user(user_id)
     except Exception as e:
         logger.exception("Text upload failed")
-        await set_reaction(context, chat_id, message_id, REACTION_ERROR)
+        await set_reaction(context, chat_id, msg.message_id, REACTION_ERROR)
         if SEND_DETAILED_ERRORS:
             await msg.reply_text(f"Error: {e}")
+        return
+    key = (chat_id, user_id, folder_id, hashtag)
+
+    _text_buffer.setdefault(key, []).append((msg, context))
+    timer = _text_timers.get(key)
+    if timer:
+        timer.cancel()
+    _text_timers[key] = asyncio.get_running_loop().call_later(
+        TEXT_BATCH_DELAY_SEC, _spawn, flush_text_batch, key
+    )
+
+    await set_reaction(context, chat_id, msg.message_id, REACTION_PROCESSING)
 
 
-def _get_attachment_info(message):
-    """Return (file, filename, mime_type) for photo/video/voice/audio/document."""
+def _attachment_meta(message):
+    """Return (media, filename, mime_type) for photo/video/voice/audio/document.
+
+    Uses message metadata only (no API call); media.file_size is Telegram's
+    reported size, which may be None.
+    """
     if message.photo:
         photo = message.photo[-1]
         ext = "jpg"
         mime = "image/jpeg"
-        return photo.get_file(), f"photo_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{ext}", mime
+        return photo, f"photo_{_ts_now()}.{ext}", mime
     if message.video:
         v = message.video
         mime = v.mime_type or "video/mp4"
-        name = v.file_name or f"video_{datetime.now().strftime('%Y%m%d_%H%M%S')}.mp4"
-        return v.get_file(), name, mime
+        name = v.file_name or f"video_{_ts_now()}.mp4"
+        return v, name, mime
     if message.voice:
         mime = message.voice.mime_type or "audio/ogg"
-        name = f"voice_{datetime.now().strftime('%Y%m%d_%H%M%S')}.ogg"
-        return message.voice.get_file(), name, mime
+        name = f"voice_{_ts_now()}.ogg"
+        return message.voice, name, mime
     if message.audio:
         a = message.audio
         mime = a.mime_type or "audio/mpeg"
-        name = a.file_name or f"audio_{datetime.now().strftime('%Y%m%d_%H%M%S')}.mp3"
-        return a.get_file(), name, mime
+        name = a.file_name or f"audio_{_ts_now()}.mp3"
+        return a, name, mime
     if message.document:
         d = message.document
         mime = d.mime_type or "application/octet-stream"
-        name = d.file_name or f"document_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-        return d.get_file(), name, mime
+        name = d.file_name or f"document_{_ts_now()}"
+        return d, name, mime
     return None, None, None
 
 
+async def _get_attachment_info(message):
+    """Return (tg_file, filename, mime_type) for photo/video/voice/audio/document.
+
+    tg_file is the resolved telegram.File (one getFile call), ready to download.
+    """
+    media, filename, mime = _attachment_meta(message)
+    if media is None:
+        return None, None, None
+    return await media.get_file(), filename, mime
+
+
+async def _download_to_stream(tg_file) -> io.BytesIO:
+    """Download a Telegram file into a BytesIO rewound to the start.
+
+    The stream is handed to Drive as-is; small payloads are still copied once
+    more when googleapiclient builds the multipart request body.
+    """
+    out = io.BytesIO()
+    await tg_file.download_to_memory(out)
+    out.seek(0)
+    return out
+
+
 async def handle_single_media(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Download one file to memory, validate, upload to Drive."""
-    if not update.message:
-        return
     msg = update.message
+    if not msg:
+        return
     chat_id = msg.chat_id
     message_id = msg.message_id
-    user_id = update.effective_user.id if update.effective_user else 0
-
-    file_obj, filename, mime_type = _get_attachment_info(msg)
-    if not file_obj:
-        return
+    user = update.effective_user
+    user_id = user.id if user else 0
 
     await set_reaction(context, chat_id, message_id, REACTION_PROCESSING)
 
     try:
-        # Download to bytes (in memory)
-        tg_file = await file_obj.get_file()
-        blob = await tg_file.download_as_bytearray()
-        content = bytes(blob)
+        tg_file, filename, mime_type = await _get_attachment_info(msg)
+        if not tg_file:
+            await set_reaction(context, chat_id, message_id, REACTION_ERROR)
+            return
 
-        folder_id, _ = await get_folder_and_hashtag(user_id)
+        # Download into an in-memory stream that is handed to Drive as-is
+        content = await _download_to_stream(tg_file)
 
-        def _upload():
-            return drive_uploader.upload_file_bytes(
-                folder_id, filename, content, mime_type
-            )
+        folder_id, _ = topic_manager.get_folder_and_hashtag_for_user(user_id)
 
-        await run_sync(_upload)
+        await drive_uploader.upload_file_bytes(
+            folder_id, filename, content, mime_type
+        )
         await set_reaction(context, chat_id, message_id, REACTION_SUCCESS)
     except FileTooLargeError as e:
         logger.warning("File too large: %s", e)
@@ -297,15 +340,121 @@ async def handle_single_media(update: Update, context: ContextTypes.DEFAULT_TYPE
             await msg.reply_text(f"Error: {e}")
 
 
+def _describe_error(e: Exception) -> str:
+    """User-facing text for an upload error (sent when SEND_DETAILED_ERRORS is on)."""
+    if isinstance(e, FileTooLargeError):
+        return f"File too large (max {e.max_size} bytes)."
+    if isinstance(e, MimeNotAllowedError):
+        return str(e)
+    return f"Error: {e}"
+
+
+def _screen_media_group(media_group_id: str, entries: list[tuple]) -> tuple[list[tuple], list[tuple]]:
+    """
+    Validate album parts from message metadata, before anything is downloaded
+    or created on Drive.
+
+    Returns:
+        (parts to upload as [(media, filename, mime_type), ...],
+         rejected parts as [(filename, error), ...])
+    """
+    parts = []
+    rejected = []
+    for msg, _ in entries:
+        media, filename, mime_type = _attachment_meta(msg)
+        if media is None:
+            continue
+        try:
+            drive_uploader.validate(media.file_size, mime_type)
+        except (FileTooLargeError, MimeNotAllowedError) as e:
+            logger.warning("Media group %s: skipping %s: %s", media_group_id, filename, e)
+            rejected.append((filename, e))
+            continue
+        parts.append((media, filename, mime_type))
+    return parts, rejected
+
+
+async def _pipeline_media_group(
+    media_group_id: str, parts: list[tuple], folder_id: str
+) -> tuple[int, list[tuple]]:
+    """
+    Stream album parts from Telegram into a new Drive subfolder.
+
+    Downloads feed a bounded queue drained by uploaders, so Drive uploads
+    overlap with the remaining Telegram downloads and only a few blobs are
+    held in memory at once. The subfolder is created when the first valid
+    part is ready. Parts that fail to download, are too large, or fail to
+    upload are skipped without stopping the rest.
+
+    Returns:
+        (number of files uploaded, skipped parts as [(filename, error), ...])
+    """
+    queue: asyncio.Queue = asyncio.Queue(maxsize=MEDIA_GROUP_PIPELINE_DEPTH)
+    download_slots = asyncio.Semaphore(MEDIA_GROUP_PIPELINE_DEPTH)
+    subfolder: asyncio.Task | None = None
+    failures: list[tuple] = []
+
+    async def _fetch(part):
+        media, filename, mime_type = part
+        async with download_slots:
+            try:
+                content = await _download_to_stream(await media.get_file())
+            except Exception as e:
+                # One failed part does not sink the album
+                logger.warning("Media group %s: download of %s failed: %s", media_group_id, filename, e)
+                failures.append((filename, e))
+                return
+            # Telegram's reported size may be missing; the downloaded size is authoritative
+            size = content.seek(0, io.SEEK_END)
+            content.seek(0)
+            try:
+                drive_uploader.validate(size, mime_type)
+            except FileTooLargeError as e:
+                logger.warning("Media group %s: skipping %s: %s", media_group_id, filename, e)
+                failures.append((filename, e))
+                return
+            await queue.put((filename, content, mime_type))
+
+    async def _produce():
+        await asyncio.gather(*(_fetch(part) for part in parts))
+        for _ in range(MEDIA_GROUP_PIPELINE_DEPTH):
+            await queue.put(None)
+
+    async def _consume() -> int:
+        nonlocal subfolder
+        uploaded = 0
+        while (item := await queue.get()) is not None:
+            if subfolder is None:
+                subfolder = asyncio.create_task(drive_uploader.create_album_folder(folder_id))
+            subfolder_id = await subfolder
+            filename, content, mime_type = item
+            try:
+                await drive_uploader.upload_file_bytes(subfolder_id, filename, content, mime_type)
+            except Exception as e:
+                # Siblings keep going: cancelling them would not stop their Drive threads anyway
+                logger.warning("Media group %s: upload of %s failed: %s", media_group_id, filename, e)
+                failures.append((filename, e))
+                continue
+            uploaded += 1
+        return uploaded
+
+    tasks = [asyncio.create_task(_produce())]
+    tasks += [asyncio.create_task(_consume()) for _ in range(MEDIA_GROUP_PIPELINE_DEPTH)]
+    try:
+        results = await asyncio.gather(*tasks)
+    finally:
+        for task in tasks:
+            task.cancel()
+        if subfolder is not None:
+            # Collect the folder task's outcome so a failed create is never left unretrieved
+            await asyncio.gather(subfolder, return_exceptions=True)
+    return sum(results[1:]), failures
+
+
 async def process_media_group(media_group_id: str) -> None:
     """Collect all messages for this media_group_id, create subfolder, upload all."""
-    async with _media_group_lock:
-        if media_group_id not in _media_group_buffer:
-            return
-        entries = _media_group_buffer.pop(media_group_id)
-        if media_group_id in _media_group_tasks:
-            del _media_group_tasks[media_group_id]
-
+    _media_group_timers.pop(media_group_id, None)
+    entries = _media_group_buffer.pop(media_group_id, None)
     if not entries:
         return
 
@@ -314,77 +463,90 @@ async def process_media_group(media_group_id: str) -> None:
     first_message_id = first_msg.message_id
     user_id = first_msg.from_user.id if first_msg.from_user else 0
 
-    await set_reaction(context, chat_id, first_message_id, REACTION_PROCESSING)
-
-    items = []  # (filename, bytes, mime_type)
+    # The processing reaction goes out alongside the work instead of ahead of it;
+    # it is awaited before the final reaction so the two always land in order.
+    processing = asyncio.create_task(
+        set_reaction(context, chat_id, first_message_id, REACTION_PROCESSING)
+    )
+    reaction = REACTION_ERROR
     try:
-        folder_id, _ = await get_folder_and_hashtag(user_id)
-
-        for msg, _ in entries:
-            file_obj, filename, mime_type = _get_attachment_info(msg)
-            if not file_obj:
-                continue
-            tg_file = await file_obj.get_file()
-            blob = await tg_file.download_as_bytearray()
-            items.append((filename, bytes(blob), mime_type))
-
-        if not items:
-            await set_reaction(context, chat_id, first_message_id, REACTION_ERROR)
-            return
-
-        def _upload_group():
-            return drive_uploader.upload_media_group(folder_id, items)
-
-        await run_sync(_upload_group)
-        await set_reaction(context, chat_id, first_message_id, REACTION_SUCCESS)
-    except FileTooLargeError as e:
-        logger.warning("Media group: file too large: %s", e)
-        await set_reaction(context, chat_id, first_message_id, REACTION_ERROR)
-        if SEND_DETAILED_ERRORS:
-            await first_msg.reply_text(f"File too large (max {e.max_size} bytes).")
-    except MimeNotAllowedError as e:
-        logger.warning("Media group: MIME not allowed: %s", e)
-        await set_reaction(context, chat_id, first_message_id, REACTION_ERROR)
-        if SEND_DETAILED_ERRORS:
-            await first_msg.reply_text(str(e))
+        folder_id, _ = topic_manager.get_folder_and_hashtag_for_user(user_id)
+
+        # Rejected parts are dropped here, so they never cost a download or an Album_* folder
+        parts, skipped = _screen_media_group(media_group_id, entries)
+        uploaded, failed = await _pipeline_media_group(media_group_id, parts, folder_id)
+        skipped += failed
+        if uploaded:
+            logger.info("Media group %s uploaded with %d files", media_group_id, uploaded)
+        if skipped:
+            # Any dropped part is an error for the album, even if the rest was saved
+            logger.warning(
+                "Media group %s: %d of %d files not saved",
+                media_group_id, len(skipped), len(skipped) + uploaded,
+            )
+            if SEND_DETAILED_ERRORS:
+                lines = [f"Saved {uploaded} of {len(skipped) + uploaded} files."]
+                lines += [f"• {filename}: {_describe_error(e)}" for filename, e in skipped]
+                await first_msg.reply_text("\n".join(lines))
+        elif uploaded:
+            reaction = REACTION_SUCCESS
     except Exception as e:
         logger.exception("Media group upload failed")
-        await set_reaction(context, chat_id, first_message_id, REACTION_ERROR)
         if SEND_DETAILED_ERRORS:
             await first_msg.reply_text(f"Error: {e}")
 
-
-async def schedule_media_group(media_group_id: str) -> None:
-    """Schedule processing of this media group after delay."""
-    async def _task():
-        await asyncio.sleep(MEDIA_GROUP_DELAY_SEC)
-        await process_media_group(media_group_id)
-
-    t = asyncio.create_task(_task())
-    async with _media_group_lock:
-        _media_group_tasks[media_group_id] = t
+    await processing
+    await set_reaction(context, chat_id, first_message_id, reaction)
 
 
 async def handle_media_with_group(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Dispatch: media group -> buffer and schedule; single -> handle_single_media."""
-    if not update.message:
-        return
     msg = update.message
+    if not msg:
+        return
     mgid = msg.media_group_id
 
     if mgid:
-        async with _media_group_lock:
-            if mgid not in _media_group_buffer:
-                _media_group_buffer[mgid] = []
-                asyncio.create_task(schedule_media_group(mgid))
-            _media_group_buffer[mgid].append((msg, context))
+        _media_group_buffer.setdefault(mgid, []).append((msg, context))
+        # Restart the quiet-period timer so slow albums are not split mid-way
+        timer = _media_group_timers.get(mgid)
+        if timer:
+            timer.cancel()
+        _media_group_timers[mgid] = asyncio.get_running_loop().call_later(
+            MEDIA_GROUP_DELAY_SEC, _spawn, process_media_group, mgid
+        )
         return
 
     await handle_single_media(update, context)
 
 
+async def on_stop(app: Application) -> None:
+    """Flush batches still waiting out their quiet period once polling has stopped.
+
+    Runs before shutdown, while the bot can still set reactions and the Drive
+    pool is still open.
+    """
+    for timer in (*_text_timers.values(), *_media_group_timers.values()):
+        timer.cancel()
+    await asyncio.gather(
+        *(flush_text_batch(key) for key in list(_text_buffer)),
+        *(process_media_group(mgid) for mgid in list(_media_group_buffer)),
+        # Flushes already started from timers
+        *list(_background_tasks),
+    )
+
+
+async def on_shutdown(app: Application) -> None:
+    """Flush pending user state and release the Drive thread pool once polling has stopped."""
+    await topic_manager.aclose()
+    await asyncio.to_thread(drive_uploader.close)
+
+
 def main() -> None:
-    global topic_manager, drive_uploader, loop
+    global topic_manager, drive_uploader
+
+    if uvloop is not None:
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
 
     if not TELEGRAM_BOT_TOKEN:
         raise ValueError("TELEGRAM_BOT_TOKEN is required")
@@ -403,10 +565,16 @@ def main() -> None:
         max_file_size=MAX_FILE_SIZE_BYTES,
         allowed_mime_types=ALLOWED_MIME_TYPES,
         text_format=TEXT_FORMAT,
+        max_concurrent_requests=DRIVE_MAX_CONCURRENT_REQUESTS,
     )
-    loop = asyncio.get_event_loop()
 
-    app = Application.builder().token(TELEGRAM_BOT_TOKEN).build()
+    app = (
+        Application.builder()
+        .token(TELEGRAM_BOT_TOKEN)
+        .post_stop(on_stop)
+        .post_shutdown(on_shutdown)
+        .build()
+    )
 
     app.add_handler(CommandHandler("start", cmd_start))
     app.add_handler(CommandHandler("topic", cmd_topic))
@@ -417,10 +585,7 @@ def main() -> None:
     topics = topic_manager.topics  # sync read at startup
     for topic_name in topics:
         app.add_handler(
-            CommandHandler(
-                topic_name,
-                lambda u, c, name=topic_name: cmd_topic_by_name(u, c, name),
-            )
+            CommandHandler(topic_name, functools.partial(cmd_topic_by_name, topic_name=topic_name))
         )
 
     app.add_handler(
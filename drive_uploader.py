@@ -3,24 +3,51 @@ Google Drive Uploader Module
 
 Handles all Google Drive API operations:
 - Service account authentication (path or JSON string)
-- File uploads from bytes (no local disk)
+- File uploads from bytes or in-memory streams (no local disk)
 - Folder creation for media groups
 - File size and MIME type validation with clear exceptions
+
+All upload methods are coroutines; the blocking HTTP exchange runs on the
+uploader's own thread pool, each worker with its own authorized connection.
 """
 
+import asyncio
 import io
 import json
 import logging
-from datetime import datetime
-from typing import Optional
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import BinaryIO, Callable, Iterable, Optional, Union
 
+import httplib2
 from google.oauth2 import service_account
+from google_auth_httplib2 import AuthorizedHttp
 from googleapiclient.discovery import build
-from googleapiclient.http import MediaIoBaseUpload
+from googleapiclient.http import HttpRequest, MediaInMemoryUpload, MediaIoBaseUpload
 from googleapiclient.errors import HttpError
 
 logger = logging.getLogger(__name__)
 
+# Payloads up to this size go up in one multipart request; a resumable session
+# costs extra round-trips that only pay off for large files.
+RESUMABLE_THRESHOLD_BYTES = 5 * 1024 * 1024
+
+# Upload content: raw bytes or a seekable in-memory binary stream (e.g. io.BytesIO)
+Content = Union[bytes, bytearray, BinaryIO]
+
+
+def _content_size(content: Content) -> int:
+    """
+    Return payload size in bytes. Streams are measured in full and rewound to
+    offset 0, which is where MediaIoBaseUpload sizes and uploads them from.
+    """
+    if isinstance(content, (bytes, bytearray)):
+        return len(content)
+    size = content.seek(0, io.SEEK_END)
+    content.seek(0)
+    return size
+
 
 class FileTooLargeError(Exception):
     """Raised when file size exceeds MAX_FILE_SIZE_BYTES."""
@@ -48,8 +75,9 @@ class DriveUploader:
         self,
         service_account_json: str,
         max_file_size: int = 20 * 1024 * 1024,  # 20 MB default
-        allowed_mime_types: Optional[list] = None,
+        allowed_mime_types: Optional[Iterable[str]] = None,
         text_format: str = "txt",
+        max_concurrent_requests: int = 8,
     ):
         """
         Initialize Drive Uploader.
@@ -57,15 +85,25 @@ class DriveUploader:
         Args:
             service_account_json: Path to service account JSON file, or raw JSON string.
             max_file_size: Maximum file size in bytes.
-            allowed_mime_types: List of allowed MIME types (None = allow all).
+            allowed_mime_types: Allowed MIME types (None or empty = allow all).
             text_format: "txt" or "doc" for text uploads.
+            max_concurrent_requests: Upper bound on Drive requests in flight at once;
+                also sizes the dedicated Drive thread pool.
         """
         self.max_file_size = max_file_size
-        self.allowed_mime_types = allowed_mime_types
+        self.allowed_mime_types = frozenset(allowed_mime_types) if allowed_mime_types else None
         self.text_format = text_format.lower() if text_format else "txt"
 
-        credentials = self._get_credentials(service_account_json)
-        self.service = build("drive", "v3", credentials=credentials)
+        self._credentials = self._get_credentials(service_account_json)
+        self.service = build("drive", "v3", credentials=self._credentials)
+        # files() synthesizes a new Resource from the discovery doc on every call
+        self._files = self.service.files()
+        self._local = threading.local()
+        self._request_slots = asyncio.Semaphore(max_concurrent_requests)
+        # Dedicated pool so Drive I/O never queues behind other default-executor users
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_concurrent_requests, thread_name_prefix="drive"
+        )
         logger.info("Google Drive service initialized successfully")
 
     def _get_credentials(self, value: str):
@@ -89,6 +127,31 @@ class DriveUploader:
             logger.error(f"Failed to load service account: {e}")
             raise
 
+    def _thread_http(self) -> AuthorizedHttp:
+        """Return the calling thread's authorized HTTP client (httplib2 is not thread-safe)."""
+        http = getattr(self._local, "http", None)
+        if http is None:
+            http = AuthorizedHttp(self._credentials, http=httplib2.Http())
+            self._local.http = http
+        return http
+
+    async def _execute(self, make_request: Callable[[], HttpRequest]) -> dict:
+        """
+        Build and execute a Drive request on the Drive pool, off the event loop.
+
+        Building happens there too: for a non-resumable upload googleapiclient
+        reads and MIME-encodes the whole payload when the request is created.
+        """
+        loop = asyncio.get_running_loop()
+        async with self._request_slots:
+            return await loop.run_in_executor(
+                self._executor, lambda: make_request().execute(http=self._thread_http())
+            )
+
+    def close(self) -> None:
+        """Shut down the Drive thread pool, waiting for in-flight requests."""
+        self._executor.shutdown(wait=True)
+
     def _validate_size(self, size: int) -> None:
         """Raise FileTooLargeError if size exceeds limit."""
         if size > self.max_file_size:
@@ -103,52 +166,83 @@ class DriveUploader:
         if mime_type not in self.allowed_mime_types:
             raise MimeNotAllowedError(mime_type)
 
-    def upload_file_bytes(
+    def validate(self, size: Optional[int], mime_type: Optional[str]) -> None:
+        """
+        Raise FileTooLargeError / MimeNotAllowedError if an upload would be rejected.
+
+        Lets callers screen files before downloading them. size may be None when
+        it is not known yet; only the MIME type is checked then.
+        """
+        if size is not None:
+            self._validate_size(size)
+        self._validate_mime(mime_type)
+
+    @staticmethod
+    def _media_body(content: Content, size: int, mime_type: str):
+        """
+        Wrap content for upload. Small payloads go up as one multipart request;
+        larger ones use a resumable session sent as a single chunk (chunksize=-1).
+        """
+        resumable = size > RESUMABLE_THRESHOLD_BYTES
+        if isinstance(content, (bytes, bytearray)):
+            return MediaInMemoryUpload(
+                content, mimetype=mime_type, chunksize=-1, resumable=resumable
+            )
+        return MediaIoBaseUpload(
+            content, mimetype=mime_type, chunksize=-1, resumable=resumable
+        )
+
+    async def upload_file_bytes(
         self,
         folder_id: str,
         filename: str,
-        content: bytes,
+        content: Content,
         mime_type: Optional[str] = None,
     ) -> str:
         """
         Upload bytes to Google Drive. Validates size and MIME; raises on failure.
 
+        Args:
+            content: Bytes, or a seekable binary stream whose entire contents are the
+                payload (uploaded from offset 0 regardless of its current position).
+
         Returns:
             Drive file ID.
         """
-        self._validate_size(len(content))
-        self._validate_mime(mime_type)
+        size = _content_size(content)
+        self.validate(size, mime_type)
 
         file_metadata = {"name": filename, "parents": [folder_id]}
-        media = MediaIoBaseUpload(
-            io.BytesIO(content),
-            mimetype=mime_type or "application/octet-stream",
-            resumable=True,
-        )
-        file = (
-            self.service.files()
-            .create(body=file_metadata, media_body=media, fields="id,name")
-            .execute()
+        mime_type = mime_type or "application/octet-stream"
+        file = await self._execute(
+            lambda: self._files.create(
+                body=file_metadata,
+                media_body=self._media_body(content, size, mime_type),
+                fields="id,name",
+            )
         )
         logger.info("Uploaded %s (ID: %s)", file.get("name"), file.get("id"))
         return file["id"]
 
-    def create_subfolder(self, parent_id: str, name: str) -> str:
+    async def create_subfolder(self, parent_id: str, name: str) -> str:
         """Create a folder under parent_id. Returns new folder ID."""
         file_metadata = {
             "name": name,
             "mimeType": "application/vnd.google-apps.folder",
             "parents": [parent_id],
         }
-        folder = (
-            self.service.files()
-            .create(body=file_metadata, fields="id,name")
-            .execute()
+        folder = await self._execute(
+            lambda: self._files.create(body=file_metadata, fields="id,name")
         )
         logger.info("Created folder %s (ID: %s)", folder.get("name"), folder.get("id"))
         return folder["id"]
 
-    def upload_text_as_file(
+    async def create_album_folder(self, parent_id: str) -> str:
+        """Create subfolder Album_YYYYMMDD_HHMMSS under parent_id. Returns new folder ID."""
+        timestamp = time.strftime("%Y%m%d_%H%M%S")
+        return await self.create_subfolder(parent_id, f"Album_{timestamp}")
+
+    async def upload_text_as_file(
         self,
         folder_id: str,
         content: str,
@@ -177,53 +271,19 @@ class DriveUploader:
                 "parents": [folder_id],
                 "mimeType": "application/vnd.google-apps.document",
             }
-            media = MediaIoBaseUpload(
-                io.BytesIO(content.encode("utf-8")),
-                mimetype="text/plain",
-                resumable=True,
-            )
         else:
             file_metadata = {
                 "name": f"{base_name}.txt",
                 "parents": [folder_id],
             }
-            media = MediaIoBaseUpload(
-                io.BytesIO(content.encode("utf-8")),
-                mimetype="text/plain",
-                resumable=True,
-            )
+        data = content.encode("utf-8")
 
-        file = (
-            self.service.files()
-            .create(body=file_metadata, media_body=media, fields="id,name")
-            .execute()
+        file = await self._execute(
+            lambda: self._files.create(
+                body=file_metadata,
+                media_body=self._media_body(data, len(data), "text/plain"),
+                fields="id,name",
+            )
         )
         logger.info("Uploaded text as %s (ID: %s)", file.get("name"), file.get("id"))
         return file["id"]
-
-    def upload_media_group(
-        self,
-        folder_id: str,
-        items: list[tuple[str, bytes, Optional[str]]],
-    ) -> str:
-        """
-        Create subfolder Album_YYYYMMDD_HHMMSS and upload all items from memory.
-
-        Args:
-            folder_id: Parent folder ID.
-            items: List of (filename, content_bytes, mime_type).
-
-        Returns:
-            New subfolder ID.
-        """
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        subfolder_name = f"Album_{timestamp}"
-        subfolder_id = self.create_subfolder(folder_id, subfolder_name)
-
-        for filename, content, mime_type in items:
-            self._validate_size(len(content))
-            self._validate_mime(mime_type)
-            self.upload_file_bytes(subfolder_id, filename, content, mime_type)
-
-        logger.info("Media group uploaded: %s with %d files", subfolder_name, len(items))
-        return subfolder_id
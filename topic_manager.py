@@ -10,20 +10,126 @@ Handles topic configuration and user state management:
 import json
 import logging
 import asyncio
-from typing import Optional, Dict, List
+import hashlib
+import mmap
+import os
+from dataclasses import dataclass, field, fields
+from types import MappingProxyType
+from typing import Optional, Dict, List, Mapping, Tuple
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:  # optional speedup; fall back to stdlib json
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
 
+def _json_loads(data: bytes):
+    """Parse JSON from UTF-8 bytes (orjson if installed)"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _json_dumps(obj, non_str_keys: bool = False, indent: bool = True) -> bytes:
+    """
+    Serialize to UTF-8 JSON bytes (orjson if installed)
+    
+    Args:
+        obj: Object to serialize
+        non_str_keys: Allow non-string dict keys (e.g. int user IDs); stdlib json always does
+        indent: 2-space indent; False gives compact single-line output
+    """
+    if orjson is not None:
+        option = orjson.OPT_INDENT_2 if indent else 0
+        if non_str_keys:
+            option |= orjson.OPT_NON_STR_KEYS
+        return orjson.dumps(obj, option=option)
+    if indent:
+        return json.dumps(obj, indent=2, ensure_ascii=False).encode('utf-8')
+    return json.dumps(obj, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+def _digest(data) -> bytes:
+    """Short content hash used to detect no-op rewrites"""
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+
+def _atomic_write(path: Path, data: bytes, fsync: bool = False) -> None:
+    """
+    Write data via a temp file and os.replace so a crash never leaves a truncated file
+    
+    Args:
+        path: Target file
+        data: File contents
+        fsync: Force data to disk before publishing (used for the final shutdown flush)
+    """
+    tmp_path = path.with_name(path.name + '.tmp')
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+        if fsync:
+            f.flush()
+            os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+@dataclass(slots=True)
+class Topic:
+    """A topic record from topics.json"""
+    
+    name: str
+    drive_folder_id: Optional[str] = None
+    hashtag: Optional[str] = None
+    description: Optional[str] = None
+    # Keys this class doesn't know about, kept so saving doesn't drop them
+    extra: Dict = field(default_factory=dict)
+    
+    @classmethod
+    def from_dict(cls, data: dict) -> "Topic":
+        """Build a Topic from its topics.json entry"""
+        data = dict(data)
+        return cls(
+            name=data.pop('name'),
+            drive_folder_id=data.pop('drive_folder_id', None),
+            hashtag=data.pop('hashtag', None),
+            description=data.pop('description', None),
+            extra=data,
+        )
+    
+    def to_dict(self) -> dict:
+        """Serialize back to a topics.json entry (unset fields are omitted)"""
+        data = {
+            f.name: getattr(self, f.name)
+            for f in _TOPIC_FIELDS
+            if getattr(self, f.name) is not None
+        }
+        data.update(self.extra)
+        return data
+
+
+_TOPIC_FIELDS = tuple(f for f in fields(Topic) if f.name != 'extra')
+
+
 class TopicManager:
     """Manages topics and user state"""
     
+    # Seconds to let a burst of user-state changes accumulate before one write
+    USER_STATE_FLUSH_DELAY = 0.2
+    # Topics files larger than this are parsed from an mmap (orjson only) instead of a bytes copy
+    MMAP_THRESHOLD_BYTES = 10_000_000
+    # User-state change-log entries tolerated before compacting into the snapshot
+    # (the log may also grow to the number of known users before compaction)
+    USER_STATE_LOG_MAX_ENTRIES = 1000
+    
     def __init__(
         self,
         topics_file: str = "topics.json",
         user_state_file: str = "user_topics.json",
-        default_folder_id: Optional[str] = None
+        default_folder_id: Optional[str] = None,
+        *,
+        load: bool = True
     ):
         """
         Initialize Topic Manager
@@ -32,95 +138,355 @@ class TopicManager:
             topics_file: Path to topics configuration file
             user_state_file: Path to user state file
             default_folder_id: Default Google Drive folder ID
+            load: Read both files now; create() passes False and loads them concurrently
         """
         self.topics_file = Path(topics_file)
         self.user_state_file = Path(user_state_file)
+        # Append-only change log replayed on top of the user state snapshot
+        self.user_state_log_file = self.user_state_file.with_name(self.user_state_file.name + '.log')
         self.default_folder_id = default_folder_id
         
         # In-memory caches
-        self.topics: Dict[str, dict] = {}
-        self.user_states: Dict[int, str] = {}  # user_id -> topic_name
+        self.topics: Dict[str, Topic] = {}
+        self._topics_sig: Optional[Tuple[int, int]] = None  # (mtime_ns, size) of last load/save
+        self._topics_digest: Optional[bytes] = None  # Content hash of last load/save
+        # Raw topics.json entries that couldn't be parsed; written back unchanged on save
+        self._invalid_topics: List = []
+        # user_id -> topic_name. Copy-on-write: writers publish a new dict, so readers
+        # and the flusher can hold a reference without copying or locking
+        self._user_states: Dict[int, str] = {}
+        # user_id -> (folder_id, hashtag); dropped when the user's topic or the topics change
+        self._user_resolved: Dict[int, Tuple[str, Optional[str]]] = {}
+        # Bytes last read from / written to the user state file; identical saves are skipped
+        self._last_user_state_blob: Optional[bytes] = None
+        # user_id -> topic_name (None = cleared) not yet appended to the change log
+        self._user_state_changes: Dict[int, Optional[str]] = {}
+        self._user_state_log_entries = 0  # Lines in the change log since the last compaction
         
-        # File locks for thread safety
+        # Write locks. Reads take no lock: the caches are only touched from the
+        # event loop and each read is a single dict operation with no await
         self.topics_lock = asyncio.Lock()
         self.user_state_lock = asyncio.Lock()
         
+        # Coalesced user-state persistence: mutations set the event and a
+        # background flusher (started lazily) appends the changes once per burst
+        self._user_state_dirty = asyncio.Event()
+        self._flusher_task: Optional[asyncio.Task] = None
+        self._closing = False
+        
         # Load initial data
-        self._load_topics()
-        self._load_user_states()
+        if load:
+            self._load_topics()
+            self._load_user_states()
+    
+    @classmethod
+    async def create(
+        cls,
+        topics_file: str = "topics.json",
+        user_state_file: str = "user_topics.json",
+        default_folder_id: Optional[str] = None
+    ) -> "TopicManager":
+        """
+        Construct a Topic Manager from async code, loading both files concurrently
+        off the event loop
+        
+        Args:
+            topics_file: Path to topics configuration file
+            user_state_file: Path to user state file
+            default_folder_id: Default Google Drive folder ID
+            
+        Returns:
+            Loaded TopicManager
+        """
+        manager = cls(topics_file, user_state_file, default_folder_id, load=False)
+        await asyncio.gather(
+            asyncio.to_thread(manager._load_topics),
+            asyncio.to_thread(manager._load_user_states),
+        )
+        return manager
+    
+    @property
+    def user_states(self) -> Mapping[int, str]:
+        """Read-only view of user_id -> topic_name"""
+        return MappingProxyType(self._user_states)
+    
+    def _read_topics(self) -> Tuple[Dict[str, Topic], List, Tuple[int, int], bytes]:
+        """
+        Parse topics file
+        
+        Returns:
+            (topics by name, raw entries that were skipped, (mtime_ns, size) signature, content hash)
+        """
+        with open(self.topics_file, 'rb') as f:
+            st = os.fstat(f.fileno())
+            if orjson is not None and st.st_size > self.MMAP_THRESHOLD_BYTES:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as view:
+                    data = orjson.loads(view)
+                    digest = _digest(view)
+            else:
+                blob = f.read()
+                data = _json_loads(blob)
+                digest = _digest(blob)
+        
+        # Support both root-level array and wrapped {"topics": [...]}
+        topics_list = data if isinstance(data, list) else data.get('topics', ())
+        # Entries without a name are skipped in the same pass instead of failing the load.
+        # A missing drive_folder_id is kept: lookups fall back to the default folder
+        topics = {}
+        invalid = []
+        for topic in topics_list:
+            if isinstance(topic, dict) and topic.get('name'):
+                topics[topic['name']] = Topic.from_dict(topic)
+            else:
+                logger.warning("Skipping topic entry without a name in %s: %r", self.topics_file, topic)
+                invalid.append(topic)
+        return topics, invalid, (st.st_mtime_ns, st.st_size), digest
     
     def _load_topics(self) -> None:
         """Load topics from JSON file"""
         try:
-            if self.topics_file.exists():
-                with open(self.topics_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    # Support both root-level array and wrapped {"topics": [...]}
-                    topics_list = data if isinstance(data, list) else data.get('topics', [])
-                    self.topics = {
-                        topic['name']: topic
-                        for topic in topics_list
-                    }
-                    
-                    logger.info(f"Loaded {len(self.topics)} topics from {self.topics_file}")
-            else:
-                logger.warning(f"Topics file {self.topics_file} not found, creating empty topics")
-                self.topics = {}
-                self._save_topics()
+            self.topics, self._invalid_topics, self._topics_sig, self._topics_digest = self._read_topics()
+            
+            logger.info("Loaded %s topics from %s", len(self.topics), self.topics_file)
+        except FileNotFoundError:
+            logger.warning("Topics file %s not found, creating empty topics", self.topics_file)
+            self.topics = {}
+            self._save_topics_sync()
         except Exception as e:
-            logger.error(f"Error loading topics: {e}")
+            logger.error("Error loading topics: %s", e)
             self.topics = {}
     
-    def _save_topics(self) -> None:
-        """Save topics to JSON file (root-level array)"""
+    def _topics_file_sig(self) -> Optional[Tuple[int, int]]:
+        """(mtime_ns, size) of the topics file, None if it can't be stat'ed"""
+        try:
+            st = self.topics_file.stat()
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+    
+    def _save_topics_sync(self, topics_list: Optional[List[Topic]] = None) -> None:
+        """Save topics (or the given snapshot) to JSON file (root-level array)"""
         try:
-            topics_list = list(self.topics.values())
-            with open(self.topics_file, 'w', encoding='utf-8') as f:
-                json.dump(topics_list, f, indent=2, ensure_ascii=False)
+            if topics_list is None:
+                topics_list = list(self.topics.values())
+            # Skipped entries are kept so a save never deletes an operator's hand edit
+            blob = _json_dumps([topic.to_dict() for topic in topics_list] + self._invalid_topics)
+            digest = _digest(blob)
+            if digest == self._topics_digest and self._topics_file_sig() == self._topics_sig:
+                return  # File already holds exactly these bytes
+            self.topics_file.write_bytes(blob)
+            self._topics_sig = self._topics_file_sig()
+            self._topics_digest = digest
             
-            logger.info(f"Saved {len(self.topics)} topics to {self.topics_file}")
+            logger.debug("Saved %s topics to %s", len(topics_list), self.topics_file)
         except Exception as e:
-            logger.error(f"Error saving topics: {e}")
+            logger.error("Error saving topics: %s", e)
+    
+    async def _save_topics_async(self, topics_list: List[Topic]) -> None:
+        """Save a topics snapshot without blocking the event loop"""
+        await asyncio.to_thread(self._save_topics_sync, topics_list)
     
     def _load_user_states(self) -> None:
-        """Load user states from JSON file"""
+        """Load user states from the JSON snapshot, then replay the change log on top"""
         try:
-            if self.user_state_file.exists():
-                with open(self.user_state_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    # Convert string keys back to integers
-                    self.user_states = {
-                        int(user_id): topic_name
-                        for user_id, topic_name in data.items()
-                    }
-                    
-                    logger.info(f"Loaded {len(self.user_states)} user states from {self.user_state_file}")
-            else:
-                logger.info(f"User state file {self.user_state_file} not found, creating empty state")
-                self.user_states = {}
-                self._save_user_states()
+            blob = self.user_state_file.read_bytes()
+            data = _json_loads(blob)
+            self._last_user_state_blob = blob
+            # Convert string keys back to integers (local name: no global lookup per key)
+            _int = int
+            self._user_states = {
+                _int(user_id): topic_name
+                for user_id, topic_name in data.items()
+            }
+            self._user_state_log_entries = self._replay_user_state_log()
+            
+            logger.info("Loaded %s user states from %s", len(self._user_states), self.user_state_file)
+        except FileNotFoundError:
+            logger.info("User state file %s not found, creating empty state", self.user_state_file)
+            self._user_states = {}
+            self._replay_user_state_log()
+            # Writing the snapshot folds in (and truncates) any replayed log
+            self._save_user_states_sync()
         except Exception as e:
-            logger.error(f"Error loading user states: {e}")
-            self.user_states = {}
+            logger.error("Error loading user states: %s", e)
+            self._user_states = {}
     
-    def _save_user_states(self) -> None:
-        """Save user states to JSON file"""
+    def _replay_user_state_log(self) -> int:
+        """
+        Apply change-log entries to the loaded user states
+        
+        Each line is a JSON array [user_id, topic_name], topic_name null meaning cleared.
+        Replay is idempotent: the last entry per user always holds that user's state.
+        
+        Returns:
+            Number of entries applied
+        """
         try:
-            self.user_state_file.parent.mkdir(parents=True, exist_ok=True)
-            # Convert integer keys to strings for JSON
-            data = {
-                str(user_id): topic_name
-                for user_id, topic_name in self.user_states.items()
-            }
+            blob = self.user_state_log_file.read_bytes()
+        except FileNotFoundError:
+            return 0
+        
+        user_states = self._user_states
+        applied = 0
+        malformed = False
+        for line in blob.splitlines():
+            try:
+                user_id, topic_name = _json_loads(line)
+            except (ValueError, TypeError):
+                # Torn last line from a crash mid-append; earlier lines are intact
+                logger.warning("Skipping malformed line in %s", self.user_state_log_file)
+                malformed = True
+                continue
+            if topic_name is None:
+                user_states.pop(user_id, None)
+            else:
+                user_states[user_id] = topic_name
+            applied += 1
+        
+        if applied:
+            logger.info("Replayed %s user state changes from %s", applied, self.user_state_log_file)
+        if malformed:
+            # Compact now so the next append doesn't land on the torn line
+            self._save_user_states_sync()
+            return 0
+        return applied
+    
+    async def reload_if_changed(self) -> bool:
+        """
+        Re-read topics file only if its mtime or size changed since the last load/save
+        
+        Holds topics_lock, so a reload never interleaves with add_topics' threaded save.
+        
+        Returns:
+            True if topics were reloaded, False if unchanged or unreadable
+        """
+        async with self.topics_lock:
+            sig = self._topics_file_sig()
+            if sig is None or sig == self._topics_sig:
+                return False
             
-            with open(self.user_state_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+            try:
+                topics, invalid, sig, digest = await asyncio.to_thread(self._read_topics)
+            except Exception as e:
+                # Keep serving the previous topics (e.g. file caught mid-edit)
+                logger.error("Error reloading topics: %s", e)
+                return False
             
-            logger.info(f"Saved {len(self.user_states)} user states to {self.user_state_file}")
+            self.topics = topics
+            self._invalid_topics = invalid
+            self._topics_sig = sig
+            self._topics_digest = digest
+            self._user_resolved.clear()
+            logger.info("Reloaded %s topics from %s", len(topics), self.topics_file)
+            return True
+    
+    def _save_user_states_sync(
+        self,
+        user_states: Optional[Dict[int, str]] = None,
+        fsync: bool = False
+    ) -> None:
+        """Atomically save user states (or the given snapshot) to JSON file and truncate the change log"""
+        if user_states is None:
+            user_states = self._user_states
+        try:
+            self.user_state_file.parent.mkdir(parents=True, exist_ok=True)
+            # Integer keys are written as JSON strings directly, no str-keyed copy.
+            # Machine-only file, so compact: older indented snapshots still load
+            blob = _json_dumps(user_states, non_str_keys=True, indent=False)
+            if blob != self._last_user_state_blob:
+                _atomic_write(self.user_state_file, blob, fsync=fsync)
+                self._last_user_state_blob = blob
+                logger.debug("Saved %s user states to %s", len(user_states), self.user_state_file)
+            # Only once the snapshot is published: the log is now fully folded in
+            self.user_state_log_file.unlink(missing_ok=True)
+        except Exception as e:
+            logger.error("Error saving user states: %s", e)
+    
+    def _append_user_state_log_sync(self, changes: Dict[int, Optional[str]], fsync: bool = False) -> None:
+        """Append changed user states to the change log in a single write"""
+        try:
+            self.user_state_log_file.parent.mkdir(parents=True, exist_ok=True)
+            blob = b''.join(
+                _json_dumps(entry, indent=False) + b'\n'
+                for entry in changes.items()
+            )
+            with open(self.user_state_log_file, 'ab') as f:
+                f.write(blob)
+                if fsync:
+                    f.flush()
+                    os.fsync(f.fileno())
         except Exception as e:
-            logger.error(f"Error saving user states: {e}")
+            logger.error("Error appending user state changes: %s", e)
     
-    async def get_topic(self, topic_name: str) -> Optional[dict]:
+    def _compact_user_states_sync(
+        self,
+        changes: Dict[int, Optional[str]],
+        user_states: Dict[int, str],
+        fsync: bool = False
+    ) -> None:
+        """Fold the change log into a fresh snapshot"""
+        # The pending changes go to the log first. A crash between publishing the
+        # snapshot and truncating the log then replays entries that all agree
+        # with the new snapshot, instead of stale ones that would roll it back
+        if changes:
+            self._append_user_state_log_sync(changes)
+        self._save_user_states_sync(user_states, fsync)
+    
+    def _record_user_state_change(self, user_id: int, topic_name: Optional[str]) -> None:
+        """Queue a user-state change for the next coalesced append"""
+        self._user_state_changes[user_id] = topic_name
+        self._user_state_dirty.set()
+        if self._flusher_task is None or self._flusher_task.done():
+            self._flusher_task = asyncio.create_task(self._flush_user_states_loop())
+    
+    async def _flush_user_states(self, fsync: bool = False, compact: bool = False) -> None:
+        """
+        Persist pending user-state changes, if any
+        
+        Args:
+            fsync: Force the write to disk
+            compact: Rewrite the snapshot even if the change log is still small
+        """
+        async with self.user_state_lock:
+            if not self._user_state_dirty.is_set():
+                return
+            self._user_state_dirty.clear()
+            changes, self._user_state_changes = self._user_state_changes, {}
+            log_entries = self._user_state_log_entries + len(changes)
+            compact = compact or log_entries > max(self.USER_STATE_LOG_MAX_ENTRIES, len(self._user_states))
+            snapshot = self._user_states if compact else None  # Never mutated once published
+        
+        # Serialized and written in a worker thread; readers aren't held up
+        if compact:
+            await asyncio.to_thread(self._compact_user_states_sync, changes, snapshot, fsync)
+            self._user_state_log_entries = 0
+        elif changes:
+            # O(changes) I/O instead of rewriting every user's state
+            await asyncio.to_thread(self._append_user_state_log_sync, changes, fsync)
+            self._user_state_log_entries = log_entries
+    
+    async def _flush_user_states_loop(self) -> None:
+        """Background flusher: one write per burst of user-state changes"""
+        while not self._closing:
+            await self._user_state_dirty.wait()
+            if not self._closing:
+                await asyncio.sleep(self.USER_STATE_FLUSH_DELAY)
+            # The last write before shutdown is a durable compaction
+            await self._flush_user_states(fsync=self._closing, compact=self._closing)
+    
+    async def aclose(self) -> None:
+        """Write any pending user-state changes and stop the background flusher"""
+        # The flusher is woken rather than cancelled: cancelling it mid-write
+        # would leave a worker thread writing while we start another write
+        self._closing = True
+        task, self._flusher_task = self._flusher_task, None
+        if task is not None and not task.done():
+            self._user_state_dirty.set()
+            await task
+        # Final durable write of anything still pending
+        await self._flush_user_states(fsync=True, compact=True)
+    
+    async def get_topic(self, topic_name: str) -> Optional[Topic]:
         """
         Get topic by name
         
@@ -128,20 +494,18 @@ class TopicManager:
             topic_name: Name of the topic
             
         Returns:
-            Topic dict if found, None otherwise
+            Topic if found, None otherwise
         """
-        async with self.topics_lock:
-            return self.topics.get(topic_name)
+        return self.topics.get(topic_name)
     
-    async def get_all_topics(self) -> List[dict]:
+    async def get_all_topics(self) -> List[Topic]:
         """
         Get all topics
         
         Returns:
-            List of all topic dicts
+            List of all topics
         """
-        async with self.topics_lock:
-            return list(self.topics.values())
+        return list(self.topics.values())
     
     async def set_user_topic(self, user_id: int, topic_name: str) -> bool:
         """
@@ -154,17 +518,20 @@ class TopicManager:
         Returns:
             True if successful, False if topic doesn't exist
         """
-        # Validate topic exists
-        topic = await self.get_topic(topic_name)
-        if not topic:
-            logger.warning(f"Attempted to set non-existent topic: {topic_name}")
+        # Validate topic exists (direct lookup; no coroutine round-trip)
+        if topic_name not in self.topics:
+            logger.warning("Attempted to set non-existent topic: %s", topic_name)
             return False
         
+        if self._user_states.get(user_id) == topic_name:
+            return True  # Already current; nothing to persist
+        
         async with self.user_state_lock:
-            self.user_states[user_id] = topic_name
-            self._save_user_states()
+            self._user_states = {**self._user_states, user_id: topic_name}
+            self._user_resolved.pop(user_id, None)
+            self._record_user_state_change(user_id, topic_name)
         
-        logger.info(f"User {user_id} topic set to: {topic_name}")
+        logger.info("User %s topic set to: %s", user_id, topic_name)
         return True
     
     async def get_user_topic(self, user_id: int) -> Optional[str]:
@@ -177,10 +544,9 @@ class TopicManager:
         Returns:
             Topic name if set, None otherwise
         """
-        async with self.user_state_lock:
-            return self.user_states.get(user_id)
+        return self._user_states.get(user_id)
     
-    async def get_folder_id_for_user(self, user_id: int) -> str:
+    def get_folder_id_for_user(self, user_id: int) -> str:
         """
         Get Google Drive folder ID for user's current topic
         
@@ -190,21 +556,12 @@ class TopicManager:
         Returns:
             Folder ID (uses default if no topic set)
         """
-        topic_name = await self.get_user_topic(user_id)
-        
-        if topic_name:
-            topic = await self.get_topic(topic_name)
-            if topic and 'drive_folder_id' in topic:
-                return topic['drive_folder_id']
-        
-        # Fallback to default folder
-        if self.default_folder_id:
-            logger.info(f"Using default folder for user {user_id}")
-            return self.default_folder_id
-        
-        raise ValueError("No topic set and no default folder configured")
+        resolved = self._user_resolved.get(user_id)
+        if resolved is not None:
+            return resolved[0]
+        return self.get_folder_and_hashtag_for_user(user_id)[0]
     
-    async def get_hashtag_for_user(self, user_id: int) -> Optional[str]:
+    def get_hashtag_for_user(self, user_id: int) -> Optional[str]:
         """
         Get hashtag for user's current topic
         
@@ -214,14 +571,42 @@ class TopicManager:
         Returns:
             Hashtag if topic set, None otherwise
         """
-        topic_name = await self.get_user_topic(user_id)
+        resolved = self._user_resolved.get(user_id)
+        if resolved is not None:
+            return resolved[1]
+        topic_name = self._user_states.get(user_id)
+        topic = self.topics.get(topic_name) if topic_name else None
+        return topic.hashtag if topic else None
+    
+    def get_folder_and_hashtag_for_user(self, user_id: int) -> Tuple[str, Optional[str]]:
+        """
+        Get folder ID and hashtag for user's current topic in a single lookup
         
-        if topic_name:
-            topic = await self.get_topic(topic_name)
-            if topic:
-                return topic.get('hashtag')
+        Args:
+            user_id: Telegram user ID
+            
+        Returns:
+            (folder_id, hashtag); default folder and no hashtag if no topic set
+        """
+        resolved = self._user_resolved.get(user_id)
+        if resolved is not None:
+            return resolved
         
-        return None
+        topic_name = self._user_states.get(user_id)
+        topic = self.topics.get(topic_name) if topic_name else None
+        hashtag = topic.hashtag if topic else None
+        
+        if topic and topic.drive_folder_id is not None:
+            resolved = (topic.drive_folder_id, hashtag)
+        elif self.default_folder_id:
+            # Fallback to default folder
+            logger.debug("Using default folder for user %s", user_id)
+            resolved = (self.default_folder_id, hashtag)
+        else:
+            raise ValueError("No topic set and no default folder configured")
+        
+        self._user_resolved[user_id] = resolved
+        return resolved
     
     async def clear_user_topic(self, user_id: int) -> None:
         """
@@ -231,10 +616,13 @@ class TopicManager:
             user_id: Telegram user ID
         """
         async with self.user_state_lock:
-            if user_id in self.user_states:
-                del self.user_states[user_id]
-                self._save_user_states()
-                logger.info(f"Cleared topic for user {user_id}")
+            if user_id in self._user_states:
+                user_states = dict(self._user_states)
+                del user_states[user_id]
+                self._user_states = user_states
+                self._user_resolved.pop(user_id, None)
+                self._record_user_state_change(user_id, None)
+                logger.info("Cleared topic for user %s", user_id)
     
     async def add_topic(
         self,
@@ -255,20 +643,46 @@ class TopicManager:
         Returns:
             True if successful, False if topic already exists
         """
-        async with self.topics_lock:
-            if name in self.topics:
-                logger.warning(f"Topic {name} already exists")
-                return False
-            
-            topic = {
-                'name': name,
-                'drive_folder_id': drive_folder_id,
-                'hashtag': hashtag or f"#{name}",
-                'description': description or f"{name} related content"
-            }
+        added = await self.add_topics([{
+            'name': name,
+            'drive_folder_id': drive_folder_id,
+            'hashtag': hashtag,
+            'description': description
+        }])
+        return added[0]
+    
+    async def add_topics(self, topics: List[dict]) -> List[bool]:
+        """
+        Add several topics with a single write of the topics file
+        
+        Args:
+            topics: Dicts with 'name' and 'drive_folder_id', optionally 'hashtag' and 'description'
             
-            self.topics[name] = topic
-            self._save_topics()
+        Returns:
+            Per-topic result: True if added, False if a topic with that name already exists
+        """
+        async with self.topics_lock:
+            new_topics = dict(self.topics)
+            results = []
+            for entry in topics:
+                name = entry['name']
+                if name in new_topics:
+                    logger.warning("Topic %s already exists", name)
+                    results.append(False)
+                    continue
+                
+                new_topics[name] = Topic(
+                    name=name,
+                    drive_folder_id=entry['drive_folder_id'],
+                    hashtag=entry.get('hashtag') or f"#{name}",
+                    description=entry.get('description') or f"{name} related content"
+                )
+                results.append(True)
+                logger.info("Added new topic: %s", name)
             
-            logger.info(f"Added new topic: {name}")
-            return True
+            if any(results):
+                # Copy-on-write: readers see either the old or the new mapping
+                self.topics = new_topics
+                self._user_resolved.clear()
+                await self._save_topics_async(list(new_topics.values()))
+            return results